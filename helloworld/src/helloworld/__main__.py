@@ -1,3 +1,5 @@
+import time
+
 import numpy as np
 
 
@@ -7,11 +9,144 @@ from psydk.visual.stimuli import PatternStimulus, TextStimulus, ImageStimulus
 from psydk.visual.color import linrgb
 from psydk.utils import now
 
-def distance(p1, p2):
-    """Calculate the distance between two points."""
-    return np.sqrt((p1[0] - p2[0]) ** 2 + (p1[1] - p2[1]) ** 2)
+# colours, created once and shared by all stimuli
+BLACK = linrgb(0, 0, 0)
+DARK = linrgb(0.1, 0.1, 0.1)
+GREY = linrgb(0.5, 0.5, 0.5)
+GREEN = linrgb(0, 1, 0)
+LIGHT_GREEN = linrgb(0.1, 1.0, 0.1)
+RED = linrgb(1, 0, 0)
+
+# squared radii for the hit tests, so we never need a square root
+R_CENTER_SQ = 100 * 100
+R_TARGET_SQ = 200 * 200
+
+# maximum deviation (in pixels) when simplifying the finished path
+SIMPLIFY_EPS = 1.0
+
+# how long to sleep when nothing on screen has changed (half a 60 Hz frame)
+IDLE_SLEEP = 1 / 120
 
 
+def in_circle(px, py, cx, cy, r2):
+    """Check whether a point lies inside a circle with squared radius `r2`."""
+    dx = px - cx
+    dy = py - cy
+    return dx * dx + dy * dy < r2
+
+
+def simplify_mask(points, eps):
+    """Simplify a polyline using the Ramer-Douglas-Peucker algorithm.
+
+    Returns a boolean mask of the points to keep. No dropped point is further
+    than `eps` from the simplified line.
+    """
+    n = len(points)
+    keep = np.zeros(n, dtype=bool)
+    if n < 3:
+        keep[:] = True
+        return keep
+
+    keep[0] = keep[-1] = True
+    eps2 = eps * eps
+    stack = [(0, n - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+
+        a = points[start]
+        d = points[end] - a
+        rel = points[start + 1 : end] - a
+        len2 = float(d @ d)
+        if len2 == 0.0:
+            dist2 = (rel * rel).sum(axis=1)
+        else:
+            # squared perpendicular distance to the line through a and b
+            cross = d[0] * rel[:, 1] - d[1] * rel[:, 0]
+            dist2 = cross * cross / len2
+
+        i = int(np.argmax(dist2))
+        if dist2[i] > eps2:
+            split = start + 1 + i
+            keep[split] = True
+            stack.append((start, split))
+            stack.append((split, end))
+
+    return keep
+
+
+class DrawState:
+    """The drawing state of a single trial.
+
+    Input handlers collect points in `pending`, which the render loop moves
+    into a preallocated (N, 2) float32 buffer once per frame. The first `n`
+    rows of the buffer are valid, and it grows by doubling when it is full.
+    `dirty` is set whenever something visible changes, so the render loops
+    can skip presenting identical frames.
+    """
+
+    __slots__ = (
+        "target",
+        "pending",
+        "points",
+        "n",
+        "last",
+        "started",
+        "started_time",
+        "active",
+        "finished",
+        "correct",
+        "dirty",
+    )
+
+    def __init__(self, target, capacity=4096):
+        self.target = target
+        self.pending = []
+        self.points = np.empty((capacity, 2), dtype=np.float32)
+        self.n = 0
+        self.last = None
+        self.started = False
+        self.started_time = None
+        self.active = False
+        self.finished = False
+        self.correct = None
+        self.dirty = True
+
+    def flush(self):
+        """Move pending points into the buffer, dropping sub-pixel moves."""
+        pending, self.pending = self.pending, []
+        if not pending:
+            return
+
+        last = self.last
+        kept = []
+        for x, y in pending:
+            # skip points that are less than a pixel away from the previous one
+            if last is None or not in_circle(x, y, last[0], last[1], 1):
+                kept.append((x, y))
+                last = (x, y)
+        self.last = last
+
+        if not kept:
+            return
+        end = self.n + len(kept)
+        while end > len(self.points):
+            self.points = np.resize(self.points, (2 * len(self.points), 2))
+        self.points[self.n : end] = kept
+        self.n = end
+
+    def clear(self):
+        """Remove all points."""
+        self.pending = []
+        self.n = 0
+        self.last = None
+        self.dirty = True
+
+    def vertices(self, start=0):
+        """Return a view of the valid points from `start` onwards."""
+        return self.points[start : self.n]
+
 
 def my_experiment(ctx, subject, session, run, overwrite=False, enable_feedback=False) -> None:
     """Run the experiment.
@@ -29,6 +164,12 @@ def my_experiment(ctx, subject, session, run, overwrite=False, enable_feedback=F
     from pathlib import Path
     res_directory = (Path(__file__).parent / "assets").resolve()
 
+    # resolve the image paths once
+    assets = {
+        "mouse_idle": str(res_directory / "imgs/mice/__white_idle_000.png"),
+        "cheese": str(res_directory / "imgs/cheese/cheese_02.png"),
+    }
+
     # register mali font
     ctx.load_font_directory(str(res_directory / "fonts/mali"))
 
@@ -36,17 +177,17 @@ def my_experiment(ctx, subject, session, run, overwrite=False, enable_feedback=F
         n_trials = 10
 
         start_text = TextStimulus(
-            "Tap anywhere to start", font_family="Mali", font_weight="medium", font_size=100, fill_color=linrgb(0, 0, 0)
+            "Tap anywhere to start", font_family="Mali", font_weight="medium", font_size=100, fill_color=BLACK
         )
 
         end_text = TextStimulus(
-            "Well done!", font_family="Mali", font_weight="medium", font_size=100, fill_color=linrgb(0, 0, 0)
+            "Well done!", font_family="Mali", font_weight="medium", font_size=100, fill_color=BLACK
         )
 
 
         key_receiver = window.create_event_receiver()
 
-        while not any([e.kind == "touch_start" or e.kind == "mouse_button_press"   for e in key_receiver.poll().events()]):
+        while not any(e.kind in ("touch_start", "mouse_button_press") for e in key_receiver.poll().events()):
             frame = window.get_frame()
             frame.add(start_text)
             window.present(frame)
@@ -56,136 +197,192 @@ def my_experiment(ctx, subject, session, run, overwrite=False, enable_feedback=F
 
         # generate n evenly spaced angles
         angles = np.linspace(0, 2 * np.pi, n_locations, endpoint=False)
-        locations = [(target_distance * np.cos(angle), target_distance * np.sin(angle)) for angle in angles]
+
+        # precompute target locations and mouse rotations as plain floats
+        cos_a = np.cos(angles)
+        sin_a = np.sin(angles)
+        rot_deg = np.rad2deg(angles) + 90
+        locations = list(zip((target_distance * cos_a).tolist(), (target_distance * sin_a).tolist()))
+        rotations = rot_deg.tolist()
+
+        # alternatively, draw random target positions for all trials at once
+        # rng = np.random.default_rng()
+        # w, h = window.get_size()
+        # targets = rng.uniform(low=[-w / 2, -h / 2], high=[w / 2, h / 2], size=(n_trials, 2)).tolist()
+
+        # create the stimuli once and only update them at the start of each trial
+
+        # create a circle in the center of the screen
+        circle_stim = PatternStimulus(
+            circle(150),
+            x=0,
+            y=0,
+            pattern="uniform",
+            pattern_size=deg(0.5),
+            pattern_rotation=0,
+            fill_color=LIGHT_GREEN,
+            stroke_width=5,
+        )
+
+        mouse_stim = ImageStimulus(
+            assets["mouse_idle"],
+            x=0,
+            y=0,
+            width=140,
+            height=240,
+        )
+
+        # create the target circle
+        target_stim = PatternStimulus(
+            circle(50),
+            x=0,
+            y=0,
+            pattern="uniform",
+            pattern_size=deg(0.5),
+            pattern_rotation=0,
+            fill_color=DARK,
+            stroke_width=25,
+        )
+
+        cheese_stim = ImageStimulus(
+            assets["cheese"],
+            x=0,
+            y=0,
+            width=150,
+            height=150,
+        )
+
+        path_stim = PatternStimulus(
+            path([]),
+            x=0,
+            y=0,
+            pattern="uniform",
+            pattern_size=deg(0.5),
+            pattern_rotation=0,
+            stroke_color=GREY,
+            stroke_width=10,
+        )
+
+        # the state of the current trial, the handlers are registered once and
+        # ignore events while no trial is running
+        current = [None]
+
+        # globals used in the handlers are bound as default arguments, which
+        # turns them into fast local lookups on every event
+        def mouse_down_handler(event, _in_circle=in_circle, _r2=R_CENTER_SQ):
+            draw_state = current[0]
+            if draw_state is None or draw_state.finished:
+                return
+            x, y = event.position
+            if _in_circle(x, y, 0.0, 0.0, _r2):
+                if draw_state.started and not draw_state.active:
+                    path_stim["stroke_color"] = GREY
+                    draw_state.clear()
+                else:
+                    draw_state.started = True
+                draw_state.started_time = now()
+                draw_state.dirty = True
+
+        def mouse_up_handler(event, _in_circle=in_circle, _r2=R_TARGET_SQ):
+            draw_state = current[0]
+            if draw_state is None or draw_state.finished:
+                return
+            if draw_state.started and draw_state.active:
+                # check if we are in the target circle
+                # if yes, make the path green
+                x, y = event.position
+                target_x, target_y = draw_state.target
+                if _in_circle(x, y, target_x, target_y, _r2):
+                    path_stim["stroke_color"] = GREEN
+                    draw_state.correct = True
+                else:
+                    path_stim["stroke_color"] = RED
+                    draw_state.correct = False
+
+                draw_state.active = False
+                draw_state.finished = True
+                draw_state.dirty = True
+
+            elif draw_state.started:
+                draw_state.started = False
+                draw_state.dirty = True
+
+        def mouse_move_handler(event):
+            draw_state = current[0]
+            if draw_state is None or draw_state.finished:
+                return
+            if draw_state.started and draw_state.active:
+                # points are coalesced and moved into the buffer once per frame
+                draw_state.pending.append(event.position)
+                draw_state.dirty = True
+
+        h1 = window.add_event_handler("mouse_button_press", mouse_down_handler)
+        h2 = window.add_event_handler("mouse_button_release", mouse_up_handler)
+        h3 = window.add_event_handler("cursor_moved", mouse_move_handler)
+
+        # touch event handlers
+        h4 = window.add_event_handler("touch_start", mouse_down_handler)
+        h5 = window.add_event_handler("touch_end", mouse_up_handler)
+        h6 = window.add_event_handler("touch_move", mouse_move_handler)
 
         for trial in range(n_trials):
             # generate a random position for the target
-            # target_x = np.random.uniform(-window.get_size()[0] / 2, window.get_size()[0] / 2)
-            # target_y = np.random.uniform(-window.get_size()[1] / 2, window.get_size()[1] / 2)
+            # target_x, target_y = targets[trial]
 
             # obtain a random position
             target_x, target_y = locations[trial % n_locations]
-            angle = angles[trial % n_locations]
-
-
-            # create a circle in the center of the screen
-            circle_stim = PatternStimulus(
-                circle(150),
-                x=0,
-                y=0,
-                pattern="uniform",
-                pattern_size=deg(0.5),
-                pattern_rotation=0,
-                fill_color=linrgb(0.1, 1.0, 0.1),
-                stroke_width=5,
-            )
-
-            mouse_stim = ImageStimulus(
-                str(res_directory / "imgs/mice/__white_idle_000.png"),
-                x=0,
-                y=0,
-                width=140,
-                height=240,
-            )
-
-            # create the target circle
-            target_stim = PatternStimulus(
-                circle(50),
-                x=target_x,
-                y=target_y,
-                pattern="uniform",
-                pattern_size=deg(0.5),
-                pattern_rotation=0,
-                fill_color=linrgb(0.1, 0.1, 0.1),
-                stroke_width=25,
-            )
-
-            cheese_stim = ImageStimulus(
-                str(res_directory / "imgs/cheese/cheese_02.png"),
-                x=target_x,
-                y=target_y,
-                width=150,
-                height=150,
-            )
-
-            path_stim = PatternStimulus(
-                path([]),
-                x=0,
-                y=0,
-                pattern="uniform",
-                pattern_size=deg(0.5),
-                pattern_rotation=0,
-                stroke_color=linrgb(0.5, 0.5, 0.5),
-                stroke_width=10,
-            )
-
-            draw_state = {
-                "points": [],
-                "started": False,
-                "started_time": None,
-                "active": False,
-                "finished": False,
-                "correct": None,
-            }
-
-            def mouse_down_handler(event):
-                if distance(event.position, (0, 0)) < 100:
-                    if draw_state["started"] and not draw_state["active"]:
-                        path_stim["stroke_color"] = linrgb(0.5, 0.5, 0.5)
-                        draw_state["points"].clear()
-                    else:
-                        draw_state["started"] = True
-                    draw_state["started_time"] = now()
-
-            def mouse_up_handler(event):
-                if draw_state["started"] and draw_state["active"]:
-                    # check if we are in the target circle
-                    # if yes, make the path green
-                    if distance(event.position, (target_x, target_y)) < 200:
-                        path_stim["stroke_color"] = linrgb(0, 1, 0)
-                        draw_state["correct"] = True
-                    else:
-                        path_stim["stroke_color"] = linrgb(1, 0, 0)
-                        draw_state["correct"] = False
-
-                    draw_state["active"] = False
-                    draw_state["finished"] = True
-
-                elif draw_state["started"]:
-                    draw_state["started"] = False
-
-            def mouse_move_handler(event):
-                if draw_state["started"] and draw_state["active"]:
-                    draw_state["points"].append(event.position)
-
-            h1 = window.add_event_handler("mouse_button_press", mouse_down_handler)
-            h2 = window.add_event_handler("mouse_button_release", mouse_up_handler)
-            h3 = window.add_event_handler("cursor_moved", mouse_move_handler)
-
-            # touch event handlers
-            h4 = window.add_event_handler("touch_start", mouse_down_handler)
-            h5 = window.add_event_handler("touch_end", mouse_up_handler)
-            h6 = window.add_event_handler("touch_move", mouse_move_handler)
-
-            while not draw_state["active"]:
-                frame = window.get_frame()
+            mouse_rot = rotations[trial % n_locations]
+
+            # reset the stimuli for this trial
+            target_stim["x"] = target_x
+            target_stim["y"] = target_y
+            cheese_stim["x"] = target_x
+            cheese_stim["y"] = target_y
+            mouse_stim["x"] = 0
+            mouse_stim["y"] = 0
+            mouse_stim["rotation"] = 0
+            path_stim["shape"] = path([])
+            path_stim["stroke_color"] = GREY
+            path_stim["stroke_width"] = 10
+
+            draw_state = DrawState((target_x, target_y))
+            current[0] = draw_state
+
+            while not draw_state.active:
                 # check if 1 s has elapsed since started_time
-                if draw_state["started"] and draw_state["started_time"] is not None and draw_state["started_time"].elapsed() > 1:
-                    draw_state["active"] = True
+                if draw_state.started and draw_state.started_time is not None and draw_state.started_time.elapsed() > 1:
+                    draw_state.active = True
+
+                # only present a new frame if something has changed
+                if not draw_state.dirty:
+                    time.sleep(IDLE_SLEEP)
+                    continue
+                draw_state.dirty = False
 
-                if draw_state["started"]:
+                frame = window.get_frame()
+                if draw_state.started:
                     frame.add(circle_stim)
 
                 frame.add(mouse_stim)
                 window.present(frame)
 
-            while True:
-                # draw the path
-                path_stim["shape"] = path(draw_state["points"])
+            # the cheese appears once drawing starts
+            draw_state.dirty = True
+            appended = 0
+            while not draw_state.finished:
+                if not draw_state.dirty:
+                    time.sleep(IDLE_SLEEP)
+                    continue
+                draw_state.dirty = False
+
+                # only send points that have been added since the last frame
+                draw_state.flush()
+                n = draw_state.n
+                if n != appended:
+                    path_stim.extend_points(draw_state.vertices(appended))
+                    appended = n
 
                 frame = window.get_frame()
-
-
                 frame.add(mouse_stim)
                 # frame.add(target_stim)
                 frame.add(cheese_stim)
@@ -193,25 +390,16 @@ def my_experiment(ctx, subject, session, run, overwrite=False, enable_feedback=F
 
                 window.present(frame)
 
-                if draw_state["finished"]:
-                    break
-
-            # remove event handlers
-            window.remove_event_handler(h1)
-            window.remove_event_handler(h2)
-            window.remove_event_handler(h3)
-            window.remove_event_handler(h4)
-            window.remove_event_handler(h5)
-            window.remove_event_handler(h6)
-
             # rotate the mouse stim to the target
-            mouse_stim["rotation"] = np.rad2deg(angle) + 90
+            mouse_stim["rotation"] = mouse_rot
 
-            # show for 1 seconds
-            path_stim["shape"] = path(draw_state["points"])
+            # show for 1 seconds, using a simplified path for the fade out
+            draw_state.flush()
+            vertices = draw_state.vertices()
+            path_stim["shape"] = path(vertices[simplify_mask(vertices, SIMPLIFY_EPS)])
             path_stim.animate("stroke_width", 0, 0.5)
 
-            if draw_state["correct"]:
+            if draw_state.correct:
                 mouse_stim.animate("x", target_x, 0.5)
                 mouse_stim.animate("y", target_y, 0.5)
 
@@ -222,6 +410,14 @@ def my_experiment(ctx, subject, session, run, overwrite=False, enable_feedback=F
             frame.add(mouse_stim)
             window.present(frame, repeat_time=0.8)
 
+        # remove event handlers
+        current[0] = None
+        window.remove_event_handler(h1)
+        window.remove_event_handler(h2)
+        window.remove_event_handler(h3)
+        window.remove_event_handler(h4)
+        window.remove_event_handler(h5)
+        window.remove_event_handler(h6)
 
         frame = window.get_frame()
         frame.add(end_text)
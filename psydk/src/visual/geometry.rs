@@ -4,6 +4,7 @@
 
 use nalgebra::{Matrix3, Vector3};
 use num_traits::Float;
+use numpy::{PyArray2, PyArrayMethods, PyUntypedArrayMethods};
 use pyo3::{prelude::*, PyClass};
 
 use super::window::{PhysicalScreen, PixelSize, Window};
@@ -126,6 +127,45 @@ impl<'py> FromPyObject<'py> for IntoSize {
     }
 }
 
+/// A list of points, extracted either from a sequence of `(x, y)` tuples or
+/// from a float32 numpy array of shape `(N, 2)`. The latter avoids converting
+/// every coordinate individually.
+pub struct IntoPoints(pub Vec<(Size, Size)>);
+
+impl From<IntoPoints> for Vec<(Size, Size)> {
+    fn from(value: IntoPoints) -> Self {
+        value.0
+    }
+}
+
+impl<'py> FromPyObject<'py> for IntoPoints {
+    fn extract_bound(ob: &Bound<'py, PyAny>) -> PyResult<Self> {
+        // try to extract a float32 array (-> Pixels)
+        if let Ok(array) = ob.downcast::<PyArray2<f32>>() {
+            if array.shape()[1] != 2 {
+                return Err(PyErr::new::<pyo3::exceptions::PyValueError, _>(
+                    "Points array must have shape (N, 2).",
+                ));
+            }
+
+            let array = array.readonly();
+            let points = array
+                .as_array()
+                .rows()
+                .into_iter()
+                .map(|row| (Size::Pixels(row[0]), Size::Pixels(row[1])))
+                .collect();
+            return Ok(IntoPoints(points));
+        }
+
+        // otherwise, extract a sequence of (x, y) tuples
+        let points: Vec<(IntoSize, IntoSize)> = ob.extract()?;
+        Ok(IntoPoints(
+            points.into_iter().map(|(x, y)| (x.into(), y.into())).collect(),
+        ))
+    }
+}
+
 #[derive(Clone, Debug)]
 pub struct SizeVector2D {
     pub x: Size,
@@ -714,16 +754,14 @@ impl Shape {
 
     #[staticmethod]
     /// Create a new polygon.
-    fn polygon(points: Vec<(IntoSize, IntoSize)>) -> Shape {
-        let points = points.into_iter().map(|(x, y)| (x.into(), y.into())).collect();
-        Shape::Polygon { points }
+    fn polygon(points: IntoPoints) -> Shape {
+        Shape::Polygon { points: points.into() }
     }
 
     #[staticmethod]
     /// Create a new path.
-    fn path(points: Vec<(IntoSize, IntoSize)>) -> Shape {
-        let points = points.into_iter().map(|(x, y)| (x.into(), y.into())).collect();
-        Shape::Path { points }
+    fn path(points: IntoPoints) -> Shape {
+        Shape::Path { points: points.into() }
     }
 
     // for printing
@@ -907,16 +945,15 @@ pub fn ellipse(x: IntoSize, y: IntoSize, radius_x: IntoSize, radius_y: IntoSize)
 
 #[pyfunction]
 /// Create a new polygon.
-pub fn polygon(points: Vec<(IntoSize, IntoSize)>) -> Shape {
-    Shape::Polygon {
-        points: points.into_iter().map(|(x, y)| (x.into(), y.into())).collect(),
-    }
+pub fn polygon(points: IntoPoints) -> Shape {
+    Shape::Polygon { points: points.into() }
 }
 
 #[pyfunction]
 /// Create a new path.
-pub fn path(points: Vec<(IntoSize, IntoSize)>) -> Shape {
-    Shape::Path {
-        points: points.into_iter().map(|(x, y)| (x.into(), y.into())).collect(),
-    }
+///
+/// `points` can be a sequence of `(x, y)` tuples or a float32 numpy array of
+/// shape `(N, 2)`, in pixels.
+pub fn path(points: IntoPoints) -> Shape {
+    Shape::Path { points: points.into() }
 }
@@ -22,7 +22,7 @@ use crate::{
     context::ExperimentContext,
     visual::{
         color::{IntoLinRgba, LinRgba},
-        geometry::{Shape, Size, Transformation2D},
+        geometry::{IntoPoints, Shape, Size, Transformation2D},
         window::{Frame, WindowState},
     },
 };
@@ -157,6 +157,18 @@ impl PatternStimulus {
 
         stim
     }
+
+    /// Append points to the shape if it is a path or polygon. Returns `false`
+    /// for any other shape.
+    pub fn extend_points(&mut self, points: Vec<(Size, Size)>) -> bool {
+        match &mut self.params.shape {
+            Shape::Path { points: shape_points } | Shape::Polygon { points: shape_points } => {
+                shape_points.extend(points);
+                true
+            }
+            _ => false,
+        }
+    }
 }
 
 #[derive(Debug, Clone)]
@@ -270,6 +282,24 @@ impl PyPatternStimulus {
             )),
         )
     }
+
+    /// Append points to the stimulus' path or polygon in place, so that a
+    /// growing path does not have to be rebuilt from scratch.
+    ///
+    /// Parameters
+    /// ----------
+    /// points : Union[list[tuple[float, float]], numpy.ndarray]
+    ///     The points to append, either as (x, y) tuples or as a float32 array
+    ///     of shape (N, 2), in pixels.
+    fn extend_points(slf: PyRef<'_, Self>, points: IntoPoints) -> PyResult<()> {
+        let mut stim = slf.as_ref().0.lock();
+        if let Some(pattern) = stim.downcast_mut::<PatternStimulus>() {
+            if pattern.extend_points(points.into()) {
+                return Ok(());
+            }
+        }
+        Err(PyValueError::new_err("extend_points requires a path or polygon shape"))
+    }
 }
 
 impl_pystimulus_for_wrapper!(PyPatternStimulus, PatternStimulus);